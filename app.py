@@ -1,20 +1,24 @@
 # app.py
+from __future__ import annotations
+
 import io
+import os
+import shutil
+import tempfile
 import time
 import zipfile
 from pathlib import Path
 
-import pandas as pd
 import streamlit as st
 
-from renderer import run_render, safe_filename
+# pandas / renderer(reportlab·pypdf)는 임포트 비용이 커서 모듈 상단에서 당기지 않고
+# 실제로 렌더링/파싱하는 시점에 지연 임포트한다 (첫 화면 로딩 단축)
 
 # -----------------------------
 # Paths
 # -----------------------------
 PROJECT_DIR = Path(__file__).resolve().parent
 TMP_DIR = PROJECT_DIR / "_tmp_uploads"
-TMP_DIR.mkdir(exist_ok=True)
 
 ASSETS_DIR = PROJECT_DIR / "assets"
 TEMPLATE_TABLE_IMG = ASSETS_DIR / "template_table.png"
@@ -27,7 +31,17 @@ TEMPLATES_DIR = PROJECT_DIR / "templates"
 COORDS_JSON = PROJECT_DIR / "coords" / "coords.json"
 ICONS_DIR = PROJECT_DIR / "icons"
 OUT_DIR = PROJECT_DIR / "output_pdf"
-OUT_DIR.mkdir(exist_ok=True)
+
+
+@st.cache_resource
+def _bootstrap():
+    # mkdir 같은 1회성 파일시스템 작업은 rerun마다 반복하지 않는다
+    TMP_DIR.mkdir(exist_ok=True)
+    OUT_DIR.mkdir(exist_ok=True)
+    return True
+
+
+_bootstrap()
 
 # -----------------------------
 # Const
@@ -104,26 +118,56 @@ def _ensure_prerequisites():
         st.stop()
 
 
-def _scan_brand_templates():
-    if not TEMPLATES_DIR.exists():
+@st.cache_data(ttl=60)
+def _scan_brand_templates(templates_dir: str):
+    # Streamlit은 위젯 조작마다 스크립트 전체를 재실행하므로
+    # 템플릿 폴더 스캔은 캐시해서 세션당 한 번만 수행
+    root = Path(templates_dir)
+    if not root.exists():
         return [], {}
 
-    brand_options = sorted([p.name for p in TEMPLATES_DIR.iterdir() if p.is_dir()])
-    brand_to_pairs = {}
+    # os.scandir는 readdir 결과에 파일 타입이 실려 와서 entry별 추가 stat이 없다
+    # (Path.iterdir + glob 조합 대비 syscall 수가 크게 준다)
+    with os.scandir(root) as it:
+        brand_options = sorted(e.name for e in it if e.is_dir())
 
+    brand_to_types = {}
     for b in brand_options:
-        pairs = set()
-        for pdf in (TEMPLATES_DIR / b).glob("*.pdf"):
-            stem = pdf.stem  # 예: BASIC_M
-            if "_" in stem:
-                bt, bg = stem.split("_", 1)
-                pairs.add((bt, bg))
-        brand_to_pairs[b] = sorted(pairs)
+        # brand -> {box_type -> sorted([box_group, ...])} 2단 dict로 미리 구성
+        # (위젯 렌더링 때마다 pairs 리스트를 필터링하지 않도록)
+        types = {}
+        with os.scandir(root / b) as it:
+            for e in it:
+                if not e.name.lower().endswith(".pdf") or not e.is_file():
+                    continue
+                stem = e.name[:-4]  # 예: BASIC_M
+                if "_" in stem:
+                    bt, bg = stem.split("_", 1)
+                    types.setdefault(bt, set()).add(bg)
+        brand_to_types[b] = {bt: sorted(groups) for bt, groups in sorted(types.items())}
+
+    return brand_options, brand_to_types
 
-    return brand_options, brand_to_pairs
+
+@st.cache_data(ttl=60)
+def _scan_icon_keys(icons_dir: str):
+    return sorted([p.stem.replace("icon_", "", 1) for p in Path(icons_dir).glob("icon_*.png") if p.is_file()])
+
+
+@st.cache_data(ttl=60)
+def _icon_keys_norm(icons_dir: str):
+    # renderer.get_icon_path와 동일하게 내부 공백까지 제거해서 비교한다
+    # ("VIET NAM" ↔ icon_vietnam.png 매칭이 사전 체크에서도 일치하도록)
+    return frozenset("".join(k.split()).lower() for k in _scan_icon_keys(icons_dir))
 
 
 def _render_single_pdf(row: dict) -> Path:
+    from renderer import _invalidate_fs_caches, run_render, safe_filename
+
+    # 배치 경로(iter_render_rows)처럼 렌더 시작 시 파일시스템 캐시를 비운다 —
+    # 서버 기동 후 추가/수정된 템플릿·아이콘·coords.json이 개별 렌더에도 반영되게
+    _invalidate_fs_caches()
+
     brand = str(row["brand"]).strip()
     box_type = str(row["box_type"]).strip()
     box_group = str(row["box_group"]).strip()
@@ -148,58 +192,139 @@ def _render_single_pdf(row: dict) -> Path:
     return output_path
 
 
-def _render_excel_to_zip(excel_path: Path, ts: str):
-    df = pd.read_excel(excel_path, dtype=str).fillna("")
+def _read_box_excel(src) -> "pd.DataFrame":
+    import pandas as pd
+
+    # calamine(Rust 기반)이 있으면 우선 사용 — openpyxl 대비 수 배 빠르고 메모리도 적음
+    try:
+        return pd.read_excel(src, dtype=str, engine="calamine")
+    except (ImportError, ValueError):
+        # read_only=True: openpyxl이 워크북 전체 DOM을 만들지 않고 행 단위로 스트리밍
+        return pd.read_excel(src, dtype=str, engine="openpyxl", engine_kwargs={"read_only": True})
+
+
+@st.cache_data(show_spinner=False)
+def _load_box_df(file_bytes: bytes) -> "pd.DataFrame":
+    # 같은 파일을 다시 실행(Run 재클릭)하면 바이트 해시 키로 캐시에서 바로 반환
+    return _read_box_excel(io.BytesIO(file_bytes)).fillna("")
+
+
+def _render_excel_to_zip(df: "pd.DataFrame", ts: str):
+    from renderer import iter_render_rows, safe_filename
     missing_cols = [c for c in REQUIRED_COLS if c not in df.columns]
     if missing_cols:
         st.error(f"엑셀 필수 컬럼 누락: {missing_cols}\n현재 컬럼: {list(df.columns)}")
         return
 
-    ok_paths = []
+    # 아이콘 없는 원산지 사전 체크 (엑셀을 다시 읽지 않고 이미 파싱된 df 사용)
+    # 행 단위 파이썬 루프 대신 pandas 벡터 문자열 연산으로 처리
+    known_icons = _icon_keys_norm(str(ICONS_DIR))
+    origins = df["origin_country"].astype(str).str.strip()
+    origins = origins[origins != ""].drop_duplicates()
+    # 렌더러와 같은 규칙(공백 전부 제거 + 소문자)으로 정규화해 비교
+    origins_norm = origins.str.replace(r"\s+", "", regex=True).str.lower()
+    no_icon = sorted(origins[~origins_norm.isin(known_icons)])
+    if no_icon:
+        st.warning(f"원산지 아이콘 없음(텍스트로 대체됩니다): {no_icon}")
+
+    # 같은 출력 경로(brand/template/item_code)의 행은 마지막 것만 렌더링한다.
+    # 값까지 같은 중복 행은 어차피 같은 PDF고, 품명만 다른 행을 둘 다 보내면
+    # 두 워커가 한 파일을 동시에 쓰고 ZIP에도 같은 이름이 두 번 들어간다.
+    tasks_by_path = {}
     fail_rows = []
 
+    for i, r in df.iterrows():
+        row = {c: r.get(c, "") for c in REQUIRED_COLS}
+
+        # 최소 필수값 체크
+        if (
+            not str(row["brand"]).strip()
+            or not str(row["box_type"]).strip()
+            or not str(row["box_group"]).strip()
+            or not str(row["item_code"]).strip()
+        ):
+            fail_rows.append((i + 2, "필수값(brand/box_type/box_group/item_code) 누락"))
+            continue
+
+        brand = str(row["brand"]).strip()
+        box_type = str(row["box_type"]).strip()
+        box_group = str(row["box_group"]).strip()
+        item_code = str(row["item_code"]).strip()
+        name_ko = str(row["product_name_ko"]).strip()
+        name_en = str(row["product_name_en"]).strip()
+        origin = str(row["origin_country"]).strip()
+        template_key = f"{box_type}_{box_group}".lower()
+
+        filename = safe_filename(f"{brand}_{template_key}_{item_code}.pdf")
+        out_path = str(OUT_DIR / filename)
+
+        tasks_by_path[out_path] = {
+            "row_no": i + 2,
+            "brand": brand,
+            "template_key": template_key,
+            "item_code": item_code,
+            "name_ko": name_ko,
+            "name_en": name_en,
+            "origin_country": origin,
+            "output_path": out_path,
+        }
+
+    tasks = list(tasks_by_path.values())
+
+    # ZIP은 메모리 버퍼 대신 임시 파일에 기록 (대량 배치에서 PDF 전체 + ZIP 전체가
+    # 동시에 RAM에 올라가는 것을 방지)
+    zip_tmp = tempfile.NamedTemporaryFile(
+        delete=False, suffix=".zip", dir=TMP_DIR, prefix=f"output_{ts}_"
+    )
+    zip_tmp.close()
+
+    # 같은 템플릿의 행을 연속 처리해 워커별 템플릿/아이콘 캐시 적중률을 높인다
+    tasks.sort(key=lambda t: (t["brand"], t["template_key"]))
+
+    ok_paths = []
+    progress = st.progress(0.0, text="렌더링 중...")
+    done = 0
     with st.spinner("렌더링 중..."):
-        for i, r in df.iterrows():
-            row = {c: r.get(c, "") for c in REQUIRED_COLS}
-
-            # 최소 필수값 체크
-            if (
-                not str(row["brand"]).strip()
-                or not str(row["box_type"]).strip()
-                or not str(row["box_group"]).strip()
-                or not str(row["item_code"]).strip()
-            ):
-                fail_rows.append((i + 2, "필수값(brand/box_type/box_group/item_code) 누락"))
-                continue
-
-            try:
-                p = _render_single_pdf(row)
-                if p.exists() and p.stat().st_size > 0:
-                    ok_paths.append(p)
-                else:
-                    fail_rows.append((i + 2, "PDF 생성 실패(파일 없음 또는 0바이트)"))
-            except Exception as e:
-                fail_rows.append((i + 2, str(e)))
+        # 행별 렌더링은 독립 작업이라 프로세스 풀로 병렬 처리하고,
+        # 전체 완료를 기다리지 않고 완성된 PDF부터 바로 ZIP에 담는다
+        # compresslevel=1: PDF 외 항목이 deflate될 때도 기본 레벨 6 대비 CPU를 크게 아낀다
+        with zipfile.ZipFile(zip_tmp.name, "w", zipfile.ZIP_DEFLATED, allowZip64=True, compresslevel=1) as zf:
+            for row_no, out_path, err in iter_render_rows(tasks):
+                done += 1
+                progress.progress(done / len(tasks), text=f"렌더링 중... ({done}/{len(tasks)})")
+                p = Path(out_path)
+                if err:
+                    fail_rows.append((row_no, err))
+                    continue
+                if not (p.exists() and p.stat().st_size > 0):
+                    fail_rows.append((row_no, "PDF 생성 실패(파일 없음 또는 0바이트)"))
+                    continue
+
+                ok_paths.append(p)
+                # PDF 스트림은 이미 압축(FlateDecode)되어 있어 deflate를 다시 돌려도
+                # 용량은 거의 줄지 않고 CPU만 소모 → PDF는 무압축(STORED)으로 담는다
+                zi = zipfile.ZipInfo.from_file(p, arcname=p.name)
+                zi.compress_type = zipfile.ZIP_STORED if p.suffix.lower() == ".pdf" else zipfile.ZIP_DEFLATED
+                # zf.write()의 내부 소버퍼 대신 256KiB 청크로 복사
+                with open(p, "rb", buffering=1 << 18) as src, zf.open(zi, "w", force_zip64=True) as dst:
+                    shutil.copyfileobj(src, dst, 1 << 18)
+
+    progress.empty()
 
     if not ok_paths:
+        Path(zip_tmp.name).unlink(missing_ok=True)
         st.error("생성된 PDF가 없습니다. 템플릿/좌표/입력값을 확인하세요.")
         if fail_rows:
             st.info("실패 내역(최대 30건):\n" + "\n".join([f"- row {n}: {msg}" for n, msg in fail_rows[:30]]))
         return
 
-    zip_buffer = io.BytesIO()
-    with zipfile.ZipFile(zip_buffer, "w", zipfile.ZIP_DEFLATED) as zf:
-        for p in ok_paths:
-            zf.write(p, arcname=p.name)
-    zip_buffer.seek(0)
-
     st.success(f"완료: {len(ok_paths)}개 PDF 생성")
     if fail_rows:
         st.warning("실패 내역(최대 30건):\n" + "\n".join([f"- row {n}: {msg}" for n, msg in fail_rows[:30]]))
 
     st.download_button(
         "결과 다운로드(zip)",
-        data=zip_buffer.getvalue(),
+        data=open(zip_tmp.name, "rb"),
         file_name=f"output_{ts}.zip",
         mime="application/zip",
     )
@@ -209,7 +334,7 @@ def _render_excel_to_zip(excel_path: Path, ts: str):
 # Init
 # -----------------------------
 _ensure_prerequisites()
-brand_options, brand_to_pairs = _scan_brand_templates()
+brand_options, brand_to_types = _scan_brand_templates(str(TEMPLATES_DIR))
 
 # -----------------------------
 # Tab 1: Manual input
@@ -229,23 +354,22 @@ with tab_manual:
         product_name_ko = st.text_input("product_name_ko (단품명) - 입력", value="")
         product_name_en = st.text_input("product_name_en (단품명_영문) - 입력", value="")
 
-        icon_keys = sorted([p.stem.replace("icon_", "", 1) for p in ICONS_DIR.glob("icon_*.png") if p.is_file()])
+        icon_keys = _scan_icon_keys(str(ICONS_DIR))
         origin_country = st.selectbox(
             "origin_country (원산지) - 선택",
             options=[""] + [k.upper() for k in icon_keys],
             index=0,
         )
 
-        pairs = brand_to_pairs.get(brand, []) if brand else []
-        box_type_options = sorted({bt for bt, _ in pairs})
+        type_to_groups = brand_to_types.get(brand, {}) if brand else {}
         box_type = st.selectbox(
             "box_type (예: BASIC, PANEL 등) - 선택",
-            options=[""] + box_type_options,
+            options=[""] + list(type_to_groups.keys()),
             index=0,
             disabled=(not brand),
         )
 
-        box_group_options = sorted({bg for bt, bg in pairs if bt == box_type}) if (brand and box_type) else []
+        box_group_options = type_to_groups.get(box_type, []) if (brand and box_type) else []
         box_group = st.selectbox(
             "box_group (예: M, S, MS 등) - 선택",
             options=[""] + box_group_options,
@@ -255,6 +379,8 @@ with tab_manual:
 
         preview = st.checkbox("미리보기(입력값 확인)", value=True)
         if preview:
+            import pandas as pd
+
             preview_df = pd.DataFrame(
                 [
                     {
@@ -299,9 +425,10 @@ with tab_manual:
                             st.error("PDF 파일을 찾을 수 없습니다.")
                         else:
                             st.success("완료: PDF 1개 생성")
+                            # read_bytes()로 전체를 복사하지 않고 파일 핸들을 그대로 전달
                             st.download_button(
                                 "PDF 다운로드",
-                                data=pdf_path.read_bytes(),
+                                data=open(pdf_path, "rb"),
                                 file_name=pdf_path.name,
                                 mime="application/pdf",
                             )
@@ -408,10 +535,9 @@ with tab_upload:
 
         if run_btn and uploaded is not None:
             ts = time.strftime("%Y%m%d_%H%M%S")
-            excel_path = TMP_DIR / f"box_data_{ts}.xlsx"
-            with open(excel_path, "wb") as f:
-                f.write(uploaded.getbuffer())
-            _render_excel_to_zip(excel_path, ts)
+            # 업로드 바이트를 캐시 키 겸 파싱 입력으로 바로 사용한다
+            # (디스크 사본은 이후 아무도 읽지 않아 쓰지 않는다)
+            _render_excel_to_zip(_load_box_df(uploaded.getvalue()), ts)
 
     with right_u:
         st.subheader("사용법")
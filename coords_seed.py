@@ -4,15 +4,24 @@ import json
 import argparse
 from datetime import datetime
 
+try:
+    import orjson  # Rust 기반 직렬화 (indent/non-ascii 경로에서 stdlib json 대비 수 배 빠름)
+except ImportError:
+    orjson = None
+
 TEMPLATE_ROOT = "templates"
 COORDS_DIR = "coords"
 COORDS_JSON_PATH = os.path.join(COORDS_DIR, "coords.json")
 
 BRANDS = ["iloom", "desker", "sloubed"]
 
+# 호출마다 re 캐시 조회를 타지 않도록 모듈 레벨에서 1회 컴파일
+_WS = re.compile(r"\s+")
+
+
 def norm(s: str) -> str:
     """파일명(확장자 제외)에서 공백 제거 + 소문자"""
-    return re.sub(r"\s+", "", str(s or "")).strip().lower()
+    return _WS.sub("", str(s or "")).strip().lower()
 
 def list_templates():
     """
@@ -30,12 +39,14 @@ def list_templates():
             # 브랜드 폴더가 없으면 비워두고 진행
             continue
 
-        for fn in os.listdir(brand_dir):
-            if not fn.lower().endswith(".pdf"):
-                continue
-            stem = os.path.splitext(fn)[0]
-            key = norm(stem)
-            result[brand][key] = fn
+        # scandir: readdir 결과에 파일 타입이 실려 와 entry별 stat이 없다
+        with os.scandir(brand_dir) as it:
+            for e in it:
+                fn = e.name
+                if not fn.lower().endswith(".pdf") or not e.is_file():
+                    continue
+                key = norm(fn[: fn.rfind(".")])
+                result[brand][key] = fn
 
     return result
 
@@ -133,8 +144,13 @@ def main():
     # template_key -> 원본 파일명
     data["template_files"] = templates
 
-    with open(COORDS_JSON_PATH, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    if orjson is not None:
+        # orjson은 UTF-8 bytes를 바로 내놓는다 (ensure_ascii=False와 동일한 출력)
+        with open(COORDS_JSON_PATH, "wb") as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+    else:
+        with open(COORDS_JSON_PATH, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
 
     # 요약 출력
     print(f"Saved: {COORDS_JSON_PATH}")
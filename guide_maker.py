@@ -1,3 +1,5 @@
+import functools
+import io
 import os
 import json
 import argparse
@@ -7,6 +9,9 @@ from reportlab.pdfgen import canvas
 from reportlab.lib.colors import Color, red, blue, black
 from pypdf import PdfReader, PdfWriter
 
+# 문자열 정규화와 템플릿 스캔은 renderer의 공통 구현을 사용
+from renderer import _template_index, normalize
+
 TEMPLATE_ROOT = "templates"
 COORDS_JSON_PATH = os.path.join("coords", "coords.json")
 GUIDE_ROOT = "guide_pdf"
@@ -20,10 +25,6 @@ def ensure_dir(path: str):
     os.makedirs(path, exist_ok=True)
 
 
-def normalize(s: str) -> str:
-    return str(s or "").strip().lower()
-
-
 def load_coords() -> Dict[Tuple[str, str], Dict[str, Any]]:
     path = COORDS_JSON_PATH
     raw = open(path, "r", encoding="utf-8").read()
@@ -59,26 +60,8 @@ def load_coords() -> Dict[Tuple[str, str], Dict[str, Any]]:
     return result
 
 def find_templates() -> Dict[Tuple[str, str], str]:
-    result = {}
-
-    if not os.path.isdir(TEMPLATE_ROOT):
-        return result
-
-    for brand in os.listdir(TEMPLATE_ROOT):
-        brand_dir = os.path.join(TEMPLATE_ROOT, brand)
-        if not os.path.isdir(brand_dir):
-            continue
-
-        b = normalize(brand)
-
-        for fn in os.listdir(brand_dir):
-            if not fn.lower().endswith(".pdf"):
-                continue
-
-            stem = os.path.splitext(fn)[0]
-            result[(b, normalize(stem))] = os.path.join(brand_dir, fn)
-
-    return result
+    # (brand, stem) -> 경로 인덱스는 renderer와 동일 — 캐시된 스캔을 재사용
+    return _template_index(TEMPLATE_ROOT)
 
 
 def draw_grid_with_axes(c: canvas.Canvas, w: float, h: float):
@@ -122,6 +105,21 @@ def draw_grid_with_axes(c: canvas.Canvas, w: float, h: float):
     c.drawString(3, 3, "0,0")
 
 
+@functools.lru_cache(maxsize=16)
+def _grid_overlay_bytes(w: float, h: float) -> bytes:
+    """
+    (w, h) 페이지용 격자+축 라벨 오버레이 PDF.
+    격자는 페이지 크기에만 의존하므로 같은 크기를 쓰는 템플릿끼리 재사용한다
+    (격자 하나가 line/drawString 수백 회 분량).
+    """
+    buf = io.BytesIO()
+    c = canvas.Canvas(buf, pagesize=(w, h))
+    draw_grid_with_axes(c, w, h)
+    c.showPage()
+    c.save()
+    return buf.getvalue()
+
+
 def make_guide(template_path: str, out_path: str, cfg: Dict[str, Any]):
     reader = PdfReader(template_path)
     page = reader.pages[0]
@@ -129,11 +127,14 @@ def make_guide(template_path: str, out_path: str, cfg: Dict[str, Any]):
     w = float(page.mediabox.width)
     h = float(page.mediabox.height)
 
-    overlay_path = out_path + ".overlay.pdf"
-    c = canvas.Canvas(overlay_path, pagesize=(w, h))
+    # 1️⃣ Grid — 페이지 크기별로 캐시된 오버레이를 먼저 병합
+    grid_reader = PdfReader(io.BytesIO(_grid_overlay_bytes(round(w, 1), round(h, 1))))
+    page.merge_page(grid_reader.pages[0])
 
-    # 1️⃣ Grid
-    draw_grid_with_axes(c, w, h)
+    # 템플릿별 표시(사각형/라벨)만 새로 그린다
+    # 오버레이는 임시 파일 대신 메모리 버퍼에 생성 (쓰기/재파싱/삭제 제거)
+    overlay_buf = io.BytesIO()
+    c = canvas.Canvas(overlay_buf, pagesize=(w, h))
 
     # 2️⃣ cover_rects (빨간색 + 번호)
     c.setStrokeColor(red)
@@ -194,9 +195,10 @@ def make_guide(template_path: str, out_path: str, cfg: Dict[str, Any]):
     c.save()
 
     # merge overlay
-    overlay_reader = PdfReader(overlay_path)
+    overlay_reader = PdfReader(overlay_buf)
     overlay_page = overlay_reader.pages[0]
 
+    # clone_from은 원본 스트림에서 재복제해 merge 결과를 잃는다 — add_page 유지
     writer = PdfWriter()
     page.merge_page(overlay_page)
     writer.add_page(page)
@@ -204,8 +206,6 @@ def make_guide(template_path: str, out_path: str, cfg: Dict[str, Any]):
     with open(out_path, "wb") as f:
         writer.write(f)
 
-    os.remove(overlay_path)
-
 
 def main():
     parser = argparse.ArgumentParser()
@@ -1,7 +1,9 @@
+import functools
+import io
 import os
 import re
 import json
-import glob
+from concurrent.futures import ProcessPoolExecutor
 from typing import Dict, Any, Tuple
 
 import pandas as pd
@@ -9,8 +11,19 @@ from reportlab.pdfgen import canvas
 from reportlab.pdfbase import pdfmetrics
 from reportlab.pdfbase.ttfonts import TTFont
 from reportlab.lib.colors import Color
+from reportlab.lib.utils import ImageReader
 from pypdf import PdfReader, PdfWriter
 
+try:
+    import pikepdf  # qpdf(C++) 기반 — 오버레이 병합이 pypdf merge_page보다 훨씬 빠름
+except ImportError:
+    pikepdf = None
+
+try:
+    import orjson  # Rust 기반 — coords.json 파싱이 stdlib json보다 수 배 빠름
+except ImportError:
+    orjson = None
+
 TEMPLATE_ROOT = "templates"
 COORDS_JSON_PATH = os.path.join("coords", "coords.json")
 ICON_DIR = "icons"
@@ -26,20 +39,50 @@ FONT_BOLD_NAME = "NotoSansKR-Bold"
 # Utils
 # --------------------------------------------------
 
+# 호출마다 re 캐시 조회를 타지 않도록 모듈 레벨에서 1회 컴파일
+_WS = re.compile(r"\s+")
+_FORBIDDEN_CHARS = re.compile(r'[\\/*?:"<>|]+')
+
+
 def normalize(s: str) -> str:
     return str(s or "").strip().lower()
 
 
+# os.path.exists 결과 캐시 — 배치 중 행마다 같은 경로를 stat하지 않는다
+# (네트워크 파일시스템에서는 stat 1회가 왕복 1회)
+_EXIST_CACHE: Dict[str, bool] = {}
+
+
+def _exists(path: str) -> bool:
+    v = _EXIST_CACHE.get(path)
+    if v is None:
+        v = _EXIST_CACHE.setdefault(path, os.path.exists(path))
+    return v
+
+
+@functools.lru_cache(maxsize=4)
+def _font_bytes(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+
 def register_fonts():
-    if os.path.exists(FONT_MEDIUM_PATH):
-        pdfmetrics.registerFont(TTFont(FONT_MEDIUM_NAME, FONT_MEDIUM_PATH))
-    if os.path.exists(FONT_BOLD_PATH):
-        pdfmetrics.registerFont(TTFont(FONT_BOLD_NAME, FONT_BOLD_PATH))
+    # 이미 등록된 폰트는 건너뛴다 — 행마다 TTF(수 MB)를 다시 파싱하지 않는다
+    registered = pdfmetrics.getRegisteredFontNames()
+    if FONT_MEDIUM_NAME not in registered and _exists(FONT_MEDIUM_PATH):
+        pdfmetrics.registerFont(TTFont(FONT_MEDIUM_NAME, io.BytesIO(_font_bytes(FONT_MEDIUM_PATH))))
+    if FONT_BOLD_NAME not in registered and _exists(FONT_BOLD_PATH):
+        pdfmetrics.registerFont(TTFont(FONT_BOLD_NAME, io.BytesIO(_font_bytes(FONT_BOLD_PATH))))
 
 
+@functools.lru_cache(maxsize=1)
 def load_coords():
-    with open(COORDS_JSON_PATH, "r", encoding="utf-8") as f:
-        data = json.load(f)
+    if orjson is not None:
+        with open(COORDS_JSON_PATH, "rb") as f:
+            data = orjson.loads(f.read())
+    else:
+        with open(COORDS_JSON_PATH, "r", encoding="utf-8") as f:
+            data = json.load(f)
 
     templates = data.get("templates", {}) or {}
     result = {}
@@ -49,35 +92,50 @@ def load_coords():
         if not isinstance(mp, dict):
             continue
         for key, cfg in mp.items():
+            # 폰트 크기는 로드 시 1회만 int 변환 (resolve_font가 행×필드마다 호출됨)
+            if isinstance(cfg, dict):
+                cfg["font_main_size"] = int(cfg.get("font_main_size", 26))
+                cfg["font_sub_size"] = int(cfg.get("font_sub_size", 12))
             result[(b, normalize(key))] = cfg
 
     return result
 
 
-def get_icon_path(country: str) -> str:
-    if not country:
-        return ""
-
+@functools.lru_cache(maxsize=1)
+def _icon_index() -> Dict[str, str]:
+    """icons/icon_<country>.png 인덱스 (소문자 국가키 -> 경로) — 폴더 스캔은 1회"""
+    idx = {}
     # icons 폴더가 없으면 icon 대신 텍스트로 대체 (예외 방지)
     if not os.path.isdir(ICON_DIR):
-        return ""
-
-    key = re.sub(r"\s+", "", country).lower()
+        return idx
 
     for fn in os.listdir(ICON_DIR):
-        if not fn.lower().endswith(".png"):
-            continue
-        if fn.lower().startswith("icon_"):
-            name = fn[5:-4].lower()
-            if name == key:
-                return os.path.join(ICON_DIR, fn)
+        if fn.lower().endswith(".png") and fn.lower().startswith("icon_"):
+            idx[fn[5:-4].lower()] = os.path.join(ICON_DIR, fn)
 
-    return ""
+    return idx
+
+
+def get_icon_path(country: str) -> str:
+    if not country:
+        return ""
+    return _icon_index().get(_WS.sub("", country).lower(), "")
+
+
+@functools.lru_cache(maxsize=64)
+def _icon_reader_or_none(path: str):
+    """
+    아이콘 ImageReader 캐시. 존재 확인(stat)과 PNG 파싱을 경로당 1회로 줄인다.
+    (아이콘 수는 국가당 1개 수준이지만 행×좌우 위치만큼 재사용된다)
+    """
+    if not path or not os.path.exists(path):
+        return None
+    return ImageReader(path)
 
 
 def resolve_font(cfg: Dict[str, Any], key: str, is_main: bool):
-    main_size = int(cfg.get("font_main_size", 26))
-    sub_size = int(cfg.get("font_sub_size", 12))
+    main_size = cfg.get("font_main_size", 26)
+    sub_size = cfg.get("font_sub_size", 12)
 
     profiles = cfg.get("font_profiles", {}) or {}
     key_map = cfg.get("font_key_profile", {}) or {}
@@ -106,25 +164,48 @@ def draw_text_rotated_180(c, x, y, text):
     c.restoreState()
 
 
-def draw_image_rotated_180(c, x, y, w, h, image_path):
+def draw_image_rotated_180(c, x, y, w, h, image):
     """
-    (x,y,w,h) 영역에 이미지를 180도 회전해서 배치
+    (x,y,w,h) 영역에 이미지(경로 또는 ImageReader)를 180도 회전해서 배치
     ReportLab은 drawImage에 rotate 옵션이 없으므로 좌표계를 회전시켜 그린다.
     """
     c.saveState()
     c.translate(x + w, y + h)  # 박스의 우상단으로 이동 후 180도 회전
     c.rotate(180)
-    c.drawImage(image_path, 0, 0, w, h, preserveAspectRatio=True)
+    c.drawImage(image, 0, 0, w, h, preserveAspectRatio=True)
     c.restoreState()
 
 
 def safe_filename(s: str) -> str:
     s = str(s or "").strip()
-    s = re.sub(r'[\\/*?:"<>|]+', "_", s)  # Windows 금지문자 치환
-    s = re.sub(r"\s+", " ", s).strip()
+    s = _FORBIDDEN_CHARS.sub("_", s)  # Windows 금지문자 치환
+    s = _WS.sub(" ", s).strip()
     return s or "output"
 
 
+@functools.lru_cache(maxsize=8)
+def _template_index(template_root: str) -> Dict[Tuple[str, str], str]:
+    """
+    (brand, normalize(stem)) -> 템플릿 경로 인덱스.
+    행마다 디렉터리를 다시 스캔하지 않도록 루트당 1회만 구성한다.
+    (배치 시작 시 cache_clear로 새 파일 반영)
+    """
+    idx = {}
+    if not os.path.isdir(template_root):
+        return idx
+
+    with os.scandir(template_root) as brands:
+        for be in brands:
+            if not be.is_dir():
+                continue
+            b = normalize(be.name)
+            with os.scandir(be.path) as files:
+                for e in files:
+                    if e.is_file() and e.name.lower().endswith(".pdf"):
+                        idx[(b, normalize(e.name[:-4]))] = e.path
+    return idx
+
+
 def find_template_path(template_root: str, brand_norm: str, template_key_norm: str) -> str:
     """
     templates/<brand>/*.pdf 중에서 파일명(확장자 제외)을
@@ -133,34 +214,210 @@ def find_template_path(template_root: str, brand_norm: str, template_key_norm: s
     - Streamlit Cloud(Linux)에서 BASIC_S.pdf vs basic_s.pdf 문제를 해결
     - 혼용(예: Basic_S.pdf)도 정상 매칭
     """
-    brand_dir = os.path.join(template_root, brand_norm)
+    idx = _template_index(template_root)
+    b = normalize(brand_norm)
+
+    hit = idx.get((b, normalize(template_key_norm)))
+    if hit:
+        return hit
 
+    brand_dir = os.path.join(template_root, brand_norm)
     if not os.path.isdir(brand_dir):
         raise FileNotFoundError(f"템플릿 브랜드 폴더 없음: {os.path.abspath(brand_dir)}")
 
-    candidates = glob.glob(os.path.join(brand_dir, "*.pdf"))
+    candidates = sorted(os.path.basename(p) for (ib, _), p in idx.items() if ib == b)
     if not candidates:
         raise FileNotFoundError(f"템플릿 PDF 없음: {os.path.abspath(brand_dir)}")
 
-    target = normalize(template_key_norm)
-
-    for p in candidates:
-        stem = normalize(os.path.splitext(os.path.basename(p))[0])
-        if stem == target:
-            return p
-
     # 디버깅용: 후보 일부 제공
-    sample = [os.path.basename(x) for x in sorted(candidates)[:30]]
     raise FileNotFoundError(
         f"템플릿 없음: {os.path.abspath(os.path.join(brand_dir, template_key_norm + '.pdf'))} "
-        f"(폴더 내 PDF 예시: {sample})"
+        f"(폴더 내 PDF 예시: {candidates[:30]})"
     )
 
 
+@functools.lru_cache(maxsize=32)
+def _load_template_bytes(path: str) -> bytes:
+    """
+    템플릿 PDF 바이트 캐시.
+    행 수천 개가 같은 템플릿을 쓰더라도 디스크 읽기는 템플릿당 1회.
+    (PdfReader 파싱은 행마다 수행 — 병합이 page 객체를 변형하므로 재사용 불가)
+    """
+    with open(path, "rb") as f:
+        return f.read()
+
+
+# cfg(dict)는 해시 불가라 lru_cache 대신 id 키 dict 사용
+# (cfg 객체는 캐시된 load_coords 결과 안에 살아 있으므로 id가 안정적)
+_DERIVED_CACHE: Dict[int, Dict[str, Any]] = {}
+
+
+def _derived_cfg(cfg: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    cfg에서 행마다 변하지 않는 부분을 템플릿당 1회만 계산한다:
+    - covers:    float 변환·유효성 검사를 마친 cover_rects
+    - texts:     (필드, x, y, 폰트, 크기) — 좌표 0/미지원 키는 미리 제외
+    - texts_rot: 위와 동일하되 180도 회전 대상
+    - icons / icons_rot: (x, y, w, h)
+    회전 대상을 미리 분리해 두면 run_render가 좌표계 변환(saveState/
+    translate/rotate)을 항목마다가 아니라 페이지당 1회만 수행할 수 있다.
+    행 루프에서는 검사·dict 조회 없이 그대로 그리기만 한다.
+    """
+    d = _DERIVED_CACHE.get(id(cfg))
+    if d is not None:
+        return d
+
+    covers = []
+    for r in cfg.get("cover_rects", []) or []:
+        if not isinstance(r, (list, tuple)) or len(r) < 4:
+            continue
+        x, y, rw, rh = map(float, r[:4])
+        if rw <= 0 or rh <= 0:
+            continue
+        covers.append((x, y, rw, rh))
+
+    rotate_cfg = cfg.get("rotate_180", {}) or {}
+    texts = []
+    texts_rot = []
+    for key, xy in (cfg.get("pos", {}) or {}).items():
+        if not isinstance(xy, (list, tuple)) or len(xy) < 2:
+            continue
+
+        x, y = float(xy[0]), float(xy[1])
+        if x == 0 and y == 0:
+            continue
+
+        if "item_code" in key:
+            field, is_main = "item_code", True
+        elif key.endswith("_name_ko"):
+            field, is_main = "name_ko", False
+        elif key.endswith("_name_en"):
+            field, is_main = "name_en", False
+        else:
+            continue
+
+        font_name, size = resolve_font(cfg, key, is_main)
+        bucket = texts_rot if rotate_cfg.get(key, False) else texts
+        bucket.append((field, x, y, font_name, size))
+
+    icon_rotate_cfg = cfg.get("icon_rotate_180", {}) or {}
+    icons = []
+    icons_rot = []
+    for key, r in (cfg.get("icon_pos", {}) or {}).items():
+        if not isinstance(r, (list, tuple)) or len(r) < 4:
+            continue
+        x, y, rw, rh = map(float, r)
+        bucket = icons_rot if icon_rotate_cfg.get(key, False) else icons
+        bucket.append((x, y, rw, rh))
+
+    d = {
+        "covers": covers,
+        "texts": texts,
+        "texts_rot": texts_rot,
+        "icons": icons,
+        "icons_rot": icons_rot,
+    }
+    _DERIVED_CACHE[id(cfg)] = d
+    return d
+
+
+@functools.lru_cache(maxsize=32)
+def _template_page_size(path: str) -> Tuple[float, float]:
+    """템플릿 1페이지의 (width, height) 포인트 — 템플릿당 1회만 파싱"""
+    page = PdfReader(io.BytesIO(_load_template_bytes(path))).pages[0]
+    return float(page.mediabox.width), float(page.mediabox.height)
+
+
 # --------------------------------------------------
 # Main render function
 # --------------------------------------------------
 
+@functools.lru_cache(maxsize=4096)
+def _overlay_bytes(
+    b: str,
+    t: str,
+    item_code: str,
+    name_ko: str,
+    name_en: str,
+    origin_country: str,
+    w: float,
+    h: float,
+) -> bytes:
+    """
+    오버레이 PDF 바이트. 키가 전부 스칼라라 같은 (템플릿, 입력값) 조합이
+    다시 오면 캔버스 그리기·폰트 서브셋 계산 없이 바이트를 재사용한다
+    (엑셀에 중복 행이 흔한 배치에서 효과가 큼).
+    """
+    cfg = load_coords()[(b, t)]
+    derived = _derived_cfg(cfg)
+
+    # 오버레이는 디스크를 거치지 않고 메모리 버퍼에 바로 생성
+    # (행마다 임시 파일 쓰기/재파싱/삭제가 사라진다)
+    overlay_buf = io.BytesIO()
+    c = canvas.Canvas(overlay_buf, pagesize=(w, h))
+
+    # --------------------------------------------------
+    # COVER (가리기) - 텍스트/아이콘보다 먼저 그려야 함
+    # --------------------------------------------------
+    if derived["covers"]:
+        c.saveState()
+        c.setFillColor(Color(1, 1, 1))    # 흰색
+        c.setStrokeColor(Color(1, 1, 1))  # 테두리도 흰색(표시 안 되게)
+        for x, y, rw, rh in derived["covers"]:
+            c.rect(x, y, rw, rh, stroke=0, fill=1)
+        c.restoreState()
+
+    # --------------------------------------------------
+    # TEXT
+    # --------------------------------------------------
+    values = {"item_code": item_code, "name_ko": name_ko, "name_en": name_en}
+
+    for field, x, y, font_name, size in derived["texts"]:
+        c.setFont(font_name, size)
+        c.drawString(x, y, values[field])
+
+    # --------------------------------------------------
+    # ICON
+    # --------------------------------------------------
+    icon_reader = _icon_reader_or_none(get_icon_path(origin_country))
+
+    for x, y, rw, rh in derived["icons"]:
+        if icon_reader is not None:
+            c.drawImage(icon_reader, x, y, rw, rh, preserveAspectRatio=True)
+        else:
+            # 아이콘이 없으면 텍스트로 대체
+            c.setFont(FONT_MEDIUM_NAME, 8)
+            c.drawString(x, y, origin_country or "")
+
+    # --------------------------------------------------
+    # 180도 회전 항목 — 좌표계를 1회만 뒤집고 일괄로 그린다
+    # (항목마다 saveState/translate/rotate/restoreState를 반복하지 않음;
+    #  (u,v)에 그리면 원래 좌표 (w-u, h-v)에 180도 회전되어 찍힌다)
+    # --------------------------------------------------
+    if derived["texts_rot"] or derived["icons_rot"]:
+        c.saveState()
+        c.translate(w, h)
+        c.rotate(180)
+
+        for field, x, y, font_name, size in derived["texts_rot"]:
+            c.setFont(font_name, size)
+            c.drawString(w - x, h - y, values[field])
+
+        for x, y, rw, rh in derived["icons_rot"]:
+            if icon_reader is not None:
+                c.drawImage(icon_reader, w - (x + rw), h - (y + rh), rw, rh,
+                            preserveAspectRatio=True)
+            else:
+                c.setFont(FONT_MEDIUM_NAME, 8)
+                c.drawString(w - x, h - y, origin_country or "")
+
+        c.restoreState()
+
+    c.showPage()
+    c.save()
+    return overlay_buf.getvalue()
+
+
 def run_render(
     brand: str,
     template_key: str,
@@ -179,8 +436,6 @@ def run_render(
     if (b, t) not in coords:
         raise ValueError(f"coords 없음: {b}/{t}")
 
-    cfg = coords[(b, t)]
-
     # [중요] 템플릿 파일명 대소문자 무시 매칭
     template_path = find_template_path(TEMPLATE_ROOT, b, t)
 
@@ -189,132 +444,171 @@ def run_render(
     os.makedirs(out_dir, exist_ok=True)
 
     abs_out = os.path.abspath(output_path)
-    overlay_path = output_path + ".overlay.pdf"
 
-    try:
-        reader = PdfReader(template_path)
+    w, h = _template_page_size(template_path)
+
+    overlay_buf = io.BytesIO(_overlay_bytes(
+        b, t, str(item_code), str(name_ko), str(name_en), str(origin_country), w, h
+    ))
+
+    if pikepdf is not None:
+        # add_overlay는 qpdf의 C++ 콘텐츠 스트림 연산 — 객체 그래프를 파이썬에서
+        # 다시 직렬화하는 pypdf merge_page보다 훨씬 저렴하다
+        with pikepdf.open(io.BytesIO(_load_template_bytes(template_path))) as pdf, \
+                pikepdf.open(overlay_buf) as overlay:
+            pdf.pages[0].add_overlay(overlay.pages[0])
+            # pypdf 폴백은 병합된 1페이지만 쓰므로, 템플릿에 페이지가 더 있어도
+            # 두 경로가 같은 문서를 내도록 여기서도 1페이지로 잘라낸다
+            del pdf.pages[1:]
+            pdf.save(output_path)
+    else:
+        reader = PdfReader(io.BytesIO(_load_template_bytes(template_path)))
         page = reader.pages[0]
+        page.merge_page(PdfReader(overlay_buf).pages[0])
 
-        w = float(page.mediabox.width)
-        h = float(page.mediabox.height)
-
-        c = canvas.Canvas(overlay_path, pagesize=(w, h))
-
-        # --------------------------------------------------
-        # COVER (가리기) - 텍스트/아이콘보다 먼저 그려야 함
-        # --------------------------------------------------
-        cover_rects = cfg.get("cover_rects", []) or []
-        if cover_rects:
-            c.saveState()
-            c.setFillColor(Color(1, 1, 1))    # 흰색
-            c.setStrokeColor(Color(1, 1, 1))  # 테두리도 흰색(표시 안 되게)
-            for r in cover_rects:
-                if not isinstance(r, (list, tuple)) or len(r) < 4:
-                    continue
-                x, y, rw, rh = map(float, r[:4])
-                if rw <= 0 or rh <= 0:
-                    continue
-                c.rect(x, y, rw, rh, stroke=0, fill=1)
-            c.restoreState()
-
-        pos = cfg.get("pos", {}) or {}
-        icon_pos = cfg.get("icon_pos", {}) or {}
-        rotate_cfg = cfg.get("rotate_180", {}) or {}
-        icon_rotate_cfg = cfg.get("icon_rotate_180", {}) or {}
-
-        # --------------------------------------------------
-        # TEXT
-        # --------------------------------------------------
-        for key, xy in pos.items():
-            if not isinstance(xy, (list, tuple)) or len(xy) < 2:
-                continue
+        # 주의: PdfWriter(clone_from=reader)는 reader의 원본 스트림에서 다시
+        # 복제하므로 위의 merge_page 결과가 버려진다 — add_page를 써야 한다
+        writer = PdfWriter()
+        writer.add_page(page)
 
-            x, y = float(xy[0]), float(xy[1])
-            if x == 0 and y == 0:
-                continue
+        with open(output_path, "wb") as f:
+            writer.write(f)
 
-            if "item_code" in key:
-                text = item_code
-                is_main = True
-            elif key.endswith("_name_ko"):
-                text = name_ko
-                is_main = False
-            elif key.endswith("_name_en"):
-                text = name_en
-                is_main = False
-            else:
-                continue
+    if not os.path.exists(output_path):
+        raise RuntimeError(f"output 파일이 생성되지 않음: {abs_out}")
+    if os.path.getsize(output_path) == 0:
+        raise RuntimeError(f"output 파일 0바이트: {abs_out}")
 
-            font_name, size = resolve_font(cfg, key, is_main)
-            c.setFont(font_name, size)
 
-            if rotate_cfg.get(key, False):
-                draw_text_rotated_180(c, x, y, text)
-            else:
-                c.drawString(x, y, text)
+# --------------------------------------------------
+# Parallel Batch Mode
+# --------------------------------------------------
 
-        # --------------------------------------------------
-        # ICON
-        # --------------------------------------------------
-        icon_path = get_icon_path(origin_country)
+def _invalidate_fs_caches():
+    """배치 시작 시 파일시스템 기반 캐시 무효화 — 배치 사이의 파일 변경을 반영한다."""
+    _EXIST_CACHE.clear()
+    _template_index.cache_clear()
+    _load_template_bytes.cache_clear()
+    _template_page_size.cache_clear()
+    _icon_index.cache_clear()
+    _icon_reader_or_none.cache_clear()
+    load_coords.cache_clear()
+    _overlay_bytes.cache_clear()
+    _DERIVED_CACHE.clear()
+
+def _render_row_task(task: Dict[str, Any]):
+    """워커 프로세스에서 1행 렌더링. (row_no, output_path, 오류메시지|None) 반환."""
+    try:
+        run_render(
+            brand=task["brand"],
+            template_key=task["template_key"],
+            item_code=task["item_code"],
+            name_ko=task["name_ko"],
+            name_en=task["name_en"],
+            origin_country=task["origin_country"],
+            output_path=task["output_path"],
+        )
+        return task.get("row_no"), task["output_path"], None
+    except Exception as e:
+        return task.get("row_no"), task["output_path"], str(e)
+
+
+def iter_render_rows(tasks, workers: int = None):
+    """
+    여러 행을 병렬 렌더링하고 결과를 하나씩 내보내는 제너레이터.
 
-        for key, r in icon_pos.items():
-            if not isinstance(r, (list, tuple)) or len(r) < 4:
-                continue
+    - 행별 PDF 생성은 공유 상태가 없는 CPU 작업이라 프로세스 풀로 분산
+    - 각 task dict: brand/template_key/item_code/name_ko/name_en/origin_country/output_path (+row_no)
+    - yield: (row_no, output_path, 오류메시지|None) (입력 순서 유지)
+    - 소비자는 전체 완료를 기다리지 않고 완성된 PDF부터 후처리(zip 등) 가능
+    """
+    tasks = list(tasks)
+    if not tasks:
+        return
 
-            x, y, rw, rh = map(float, r)
-            do_rot = bool(icon_rotate_cfg.get(key, False))
+    _invalidate_fs_caches()
 
-            if icon_path and os.path.exists(icon_path):
-                if do_rot:
-                    draw_image_rotated_180(c, x, y, rw, rh, icon_path)
-                else:
-                    c.drawImage(icon_path, x, y, rw, rh, preserveAspectRatio=True)
-            else:
-                # 아이콘이 없으면 텍스트로 대체
-                c.setFont(FONT_MEDIUM_NAME, 8)
-                if do_rot:
-                    draw_text_rotated_180(c, x, y, origin_country or "")
-                else:
-                    c.drawString(x, y, origin_country or "")
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(tasks) == 1:
+        for t in tasks:
+            yield _render_row_task(t)
+        return
 
-        c.showPage()
-        c.save()
+    with ProcessPoolExecutor(max_workers=min(workers, len(tasks)), initializer=register_fonts) as ex:
+        yield from ex.map(_render_row_task, tasks)
 
-        overlay_reader = PdfReader(overlay_path)
-        overlay_page = overlay_reader.pages[0]
 
-        writer = PdfWriter()
-        page.merge_page(overlay_page)
-        writer.add_page(page)
+def render_rows(tasks, workers: int = None):
+    """iter_render_rows를 전부 소진해서 리스트로 반환."""
+    return list(iter_render_rows(tasks, workers))
 
-        with open(output_path, "wb") as f:
-            writer.write(f)
 
-        if not os.path.exists(output_path):
-            raise RuntimeError(f"output 파일이 생성되지 않음: {abs_out}")
-        if os.path.getsize(output_path) == 0:
-            raise RuntimeError(f"output 파일 0바이트: {abs_out}")
+# --------------------------------------------------
+# Excel Batch Mode
+# --------------------------------------------------
 
+def iter_excel_rows(excel_path: str):
+    """
+    첫 시트를 {헤더: 값} dict로 행 단위 스트리밍한다.
+    openpyxl read_only 모드는 워크북 DOM을 만들지 않으므로
+    파일이 아무리 커도 메모리는 상수 수준으로 유지된다.
+    """
+    import openpyxl
+
+    wb = openpyxl.load_workbook(excel_path, read_only=True, data_only=True)
+    try:
+        rows = wb.active.iter_rows(values_only=True)
+        headers = next(rows, None)
+        if not headers:
+            return
+        idx = {h: i for i, h in enumerate(headers) if h is not None}
+        for row in rows:
+            yield {h: (row[i] if i < len(row) else None) for h, i in idx.items()}
     finally:
-        if os.path.exists(overlay_path):
-            try:
-                os.remove(overlay_path)
-            except Exception as e:
-                print("overlay 삭제 실패:", overlay_path, e)
+        wb.close()
 
 
-# --------------------------------------------------
-# Excel Batch Mode
-# --------------------------------------------------
+def read_box_excel(excel_path: str):
+    """
+    box_data.xlsx를 DataFrame으로 읽는다.
+
+    - 반복 실행을 위해 파싱 결과를 Feather 사이드카(<경로>.feather)로 캐시.
+      xlsx보다 새로우면 재파싱 없이 바로 읽는다 (Feather 읽기가 수십 배 빠름)
+    - calamine(Rust) 엔진이 있으면 XML DOM을 만들지 않는 단일 패스 파서로 읽고,
+      없으면 openpyxl read_only 스트리밍(iter_excel_rows)으로 폴백
+    """
+    cache_path = str(excel_path) + ".feather"
+    try:
+        if os.path.getmtime(cache_path) >= os.path.getmtime(excel_path):
+            return pd.read_feather(cache_path)
+    except OSError:
+        pass
+
+    try:
+        df = pd.read_excel(excel_path, dtype=str, engine="calamine")
+    except (ImportError, ValueError):
+        # pd.read_excel의 기본 openpyxl 경로는 전체 DOM을 만들므로
+        # read_only 스트리밍으로 행을 모아 DataFrame을 구성한다
+        df = pd.DataFrame.from_records(
+            {k: ("" if v is None else str(v)) for k, v in rec.items()}
+            for rec in iter_excel_rows(excel_path)
+        )
+
+    try:
+        df.to_feather(cache_path)
+    except Exception:
+        pass  # pyarrow 미설치 등 — 캐시는 있으면 좋은 것일 뿐
+    return df
+
 
-def run_batch_from_excel(excel_path="box_data.xlsx", output_dir="output_pdf"):
+def run_batch_from_excel(excel_path="box_data.xlsx", output_dir="output_pdf", workers=None,
+                         combined_out=None):
     if not os.path.exists(excel_path):
         raise FileNotFoundError(f"엑셀 파일 없음: {os.path.abspath(excel_path)}")
 
     os.makedirs(output_dir, exist_ok=True)
 
-    df = pd.read_excel(excel_path, dtype=str).fillna("")
+    df = read_box_excel(excel_path).fillna("")
 
     required_cols = [
         "brand", "box_type", "box_group", "item_code",
@@ -324,43 +618,63 @@ def run_batch_from_excel(excel_path="box_data.xlsx", output_dir="output_pdf"):
     if missing:
         raise ValueError(f"엑셀 필수 컬럼 누락: {missing} / 현재 컬럼: {list(df.columns)}")
 
-    success = 0
-    fail = 0
-
-    for idx, row in df.iterrows():
-        brand = row.get("brand", "").strip()
-        box_type = row.get("box_type", "").strip()
-        box_group = row.get("box_group", "").strip()
-        item_code = row.get("item_code", "").strip()
-        name_ko = row.get("product_name_ko", "").strip()
-        name_en = row.get("product_name_en", "").strip()
-        origin_country = row.get("origin_country", "").strip()
-
-        if not brand or not box_type or not box_group or not item_code:
+    # 셀 단위 strip은 행 루프 밖에서 pandas 벡터 연산으로 일괄 처리
+    # (iterrows는 셀마다 파이썬 객체를 다시 박싱하는 가장 느린 순회 방식)
+    for col in required_cols:
+        df[col] = df[col].astype(str).str.strip()
+
+    # 같은 output_path(= brand/template/item_code)를 가진 행이 여러 개면 마지막
+    # 행만 남긴다 — 직렬 처리의 '마지막 쓰기 승리'와 같은 결과를 내면서,
+    # 두 워커가 한 파일을 동시에 쓰며 PDF를 깨뜨리는 경쟁을 차단한다
+    tasks_by_path = {}
+    for i, rec in enumerate(df.to_dict("records")):
+        if not rec["brand"] or not rec["box_type"] or not rec["box_group"] or not rec["item_code"]:
             continue
 
         # template_key는 일관된 키로 coords 및 템플릿 매칭에 사용
-        template_key = f"{box_type}_{box_group}"
-        template_key_norm = template_key.lower()
-
-        filename = safe_filename(f"{brand}_{template_key_norm}_{item_code}.pdf")
+        template_key_norm = f"{rec['box_type']}_{rec['box_group']}".lower()
+        filename = safe_filename(f"{rec['brand']}_{template_key_norm}_{rec['item_code']}.pdf")
         output_path = os.path.join(output_dir, filename)
 
-        try:
-            run_render(
-                brand=brand,
-                template_key=template_key_norm,
-                item_code=item_code,
-                name_ko=name_ko,
-                name_en=name_en,
-                origin_country=origin_country,
-                output_path=output_path,
-            )
-            success += 1
-            print(f"[OK] row {idx+2} → {output_path}")
-        except Exception as e:
+        tasks_by_path[output_path] = {
+            "row_no": i + 2,
+            "brand": rec["brand"],
+            "template_key": template_key_norm,
+            "item_code": rec["item_code"],
+            "name_ko": rec["product_name_ko"],
+            "name_en": rec["product_name_en"],
+            "origin_country": rec["origin_country"],
+            "output_path": output_path,
+        }
+
+    tasks = list(tasks_by_path.values())
+
+    # 같은 템플릿의 행을 연속 처리해 워커별 템플릿/아이콘 캐시 적중률을 높인다
+    # (row_no를 들고 다니므로 로그의 엑셀 행 번호는 그대로)
+    tasks.sort(key=lambda t: (t["brand"], t["template_key"]))
+
+    success = 0
+    fail = 0
+    ok_paths = []
+
+    # 행별 렌더링은 독립 작업이라 프로세스 풀로 병렬 처리
+    for row_no, output_path, err in iter_render_rows(tasks, workers=workers):
+        if err:
             fail += 1
-            print(f"[FAIL] row {idx+2} → {e}")
+            print(f"[FAIL] row {row_no} → {err}")
+        else:
+            success += 1
+            ok_paths.append(output_path)
+            print(f"[OK] row {row_no} → {output_path}")
+
+    # 인쇄 워크플로용 합본: 행별 PDF를 1개 다중 페이지 PDF로 묶어 1회만 기록
+    if combined_out and ok_paths:
+        writer = PdfWriter()
+        for p in ok_paths:
+            writer.append(p)
+        with open(combined_out, "wb") as f:
+            writer.write(f)
+        print(f"[COMBINED] {combined_out} ({len(ok_paths)}페이지)")
 
     print(f"\n완료: 성공 {success}건 / 실패 {fail}건")
 
@@ -1,22 +1,25 @@
+import functools
+import io
 import os
 import re
 import argparse
 import pandas as pd
 
 from reportlab.pdfgen import canvas
-from reportlab.lib.utils import ImageReader
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
 
 from pypdf import PdfReader, PdfWriter
 
+# 공통 구현은 renderer에 있다 — 로더/캐시류를 여기서 재정의하지 않는다
+# (웹/CLI 양쪽에서 버그 수정·최적화가 한 곳에만 들어가면 되도록)
+import renderer
+from renderer import _icon_reader_or_none, _load_template_bytes, get_icon_path
+
 # =========================
 # 기본 경로
 # =========================
 XLSX_PATH = "box_data.xlsx"
 TEMPLATE_ROOT = "templates"
-ICON_DIR = "icons"
-FONT_PATH = os.path.join("fonts", "NotoSansKR-Medium.ttf")
+FONT_PATH = renderer.FONT_MEDIUM_PATH
 
 OUT_DIR = "output_pdf"
 GUIDE_DIR = "guide_pdf"
@@ -27,43 +30,53 @@ os.makedirs(GUIDE_DIR, exist_ok=True)
 # 폰트 등록
 # =========================
 def register_fonts():
+    # 등록 자체는 renderer와 공유 — CLI는 폰트가 없으면 조용히 넘어가지 않고 실패한다
     if not os.path.exists(FONT_PATH):
         raise FileNotFoundError(f"폰트 파일 없음: {FONT_PATH}")
-    pdfmetrics.registerFont(TTFont("NotoSansKR-Medium", FONT_PATH))
+    renderer.register_fonts()
 
 # =========================
 # 문자열 정규화(공백 제거 + 소문자)
 # =========================
+# renderer.normalize와 달리 내부 공백까지 제거한다 (기존 템플릿 매칭 규칙 유지)
+_WS = re.compile(r"\s+")
+
+
 def norm(s: str) -> str:
-    return re.sub(r"\s+", "", str(s or "")).strip().lower()
+    return _WS.sub("", str(s or "")).strip().lower()
 
 # =========================
 # 템플릿 찾기
 # templates/<brand>/<box_type>_<box_group>.pdf
 # 공백/대소문자 무시 매칭
 # =========================
-def find_template_pdf(brand: str, box_type: str, box_group: str) -> str:
+@functools.lru_cache(maxsize=8)
+def _template_index(brand: str) -> dict:
+    """brand 폴더의 {norm(stem): 경로} 인덱스 — 행마다 listdir를 반복하지 않는다"""
     brand_dir = os.path.join(TEMPLATE_ROOT, brand)
     if not os.path.isdir(brand_dir):
         raise FileNotFoundError(f"템플릿 브랜드 폴더 없음: {brand_dir}")
 
+    idx = {}
+    with os.scandir(brand_dir) as it:
+        for e in it:
+            if e.is_file() and e.name.lower().endswith(".pdf"):
+                idx[norm(e.name[:-4])] = e.path
+    return idx
+
+
+def find_template_pdf(brand: str, box_type: str, box_group: str) -> str:
     target = norm(f"{box_type}_{box_group}")
 
-    for fn in os.listdir(brand_dir):
-        if not fn.lower().endswith(".pdf"):
-            continue
-        key = norm(os.path.splitext(fn)[0])
-        if key == target:
-            return os.path.join(brand_dir, fn)
+    path = _template_index(brand).get(target)
+    if path:
+        return path
 
     raise FileNotFoundError(f"템플릿 없음: {brand}/{box_type}_{box_group}.pdf")
 
-# =========================
-# 아이콘 경로: icons/icon_<country>.png
-# =========================
-def get_icon_path(country: str) -> str:
-    c = re.sub(r"\s+", "", str(country or "")).strip().upper()
-    return os.path.join(ICON_DIR, f"icon_{c}.png")
+# 템플릿 바이트 캐시와 아이콘 조회(get_icon_path / _icon_reader_or_none)는
+# renderer의 것을 그대로 쓴다. 아이콘은 renderer가 icons/ 폴더를 1회 스캔해
+# 대소문자 무시로 찾으므로 Linux에서 icon_KR.png/icon_kr.png 혼용도 매칭된다.
 
 # =========================
 # 브랜드별 좌표 설정 (예시)
@@ -143,8 +156,10 @@ COORDS = {
 # =========================
 # 오버레이 PDF 생성
 # =========================
-def make_overlay_pdf(overlay_path: str, page_w: float, page_h: float, cfg: dict, row: dict):
-    c = canvas.Canvas(overlay_path, pagesize=(page_w, page_h))
+def make_overlay_pdf(page_w: float, page_h: float, cfg: dict, row: dict) -> bytes:
+    # 임시 파일 없이 메모리 버퍼에 오버레이 PDF 생성
+    buf = io.BytesIO()
+    c = canvas.Canvas(buf, pagesize=(page_w, page_h))
 
     # 1) 가리기(흰 박스)
     c.setFillColorRGB(1, 1, 1)
@@ -171,29 +186,30 @@ def make_overlay_pdf(overlay_path: str, page_w: float, page_h: float, cfg: dict,
 
     # 3) 원산지 아이콘
     origin = str(row.get("origin_country", "")).strip()
-    ip = get_icon_path(origin)
-
-    if os.path.exists(ip):
-        # 좌/우 둘 다 찍는 구조
-        for k in ("L_origin", "R_origin"):
-            x, y, w, h = cfg["icon_pos"][k]
-            c.drawImage(ImageReader(ip), x, y, width=w, height=h, mask="auto")
-    else:
-        # 아이콘 없으면 텍스트 대체(원하면 삭제)
+    icon_reader = _icon_reader_or_none(get_icon_path(origin))
+
+    if icon_reader is None:
         c.setFont("NotoSansKR-Medium", 10)
-        c.drawString(cfg["icon_pos"]["L_origin"][0], cfg["icon_pos"]["L_origin"][1] + 10, f"MADE IN {origin}")
-        c.drawString(cfg["icon_pos"]["R_origin"][0], cfg["icon_pos"]["R_origin"][1] + 10, f"MADE IN {origin}")
+
+    # 좌/우 둘 다 찍는 구조 — 아이콘 없으면 텍스트 대체(원하면 삭제)
+    for k in ("L_origin", "R_origin"):
+        x, y, w, h = cfg["icon_pos"][k]
+        if icon_reader is not None:
+            c.drawImage(icon_reader, x, y, width=w, height=h, mask="auto")
+        else:
+            c.drawString(x, y + 10, f"MADE IN {origin}")
 
     c.save()
+    return buf.getvalue()
 
 # =========================
 # 템플릿 위에 좌표 가이드(격자/라벨/사각형) 오버레이 생성
 # =========================
-def make_guide_overlay_pdf(overlay_path: str, page_w: float, page_h: float, cfg: dict):
-    c = canvas.Canvas(overlay_path, pagesize=(page_w, page_h))
-
-    # 격자 간격(포인트)
-    step = 50
+@functools.lru_cache(maxsize=16)
+def _guide_grid_bytes(page_w: float, page_h: float, step: int = 50) -> bytes:
+    """격자+좌표 라벨 오버레이 — 페이지 크기에만 의존하므로 크기별로 1회만 생성"""
+    buf = io.BytesIO()
+    c = canvas.Canvas(buf, pagesize=(page_w, page_h))
 
     # 옅은 격자선
     c.setStrokeColorRGB(0.8, 0.8, 0.8)
@@ -211,6 +227,13 @@ def make_guide_overlay_pdf(overlay_path: str, page_w: float, page_h: float, cfg:
     for y in range(0, int(page_h) + 1, step * 2):
         c.drawString(2, y + 2, f"y={y}")
 
+    c.save()
+    return buf.getvalue()
+
+def make_guide_overlay_pdf(page_w: float, page_h: float, cfg: dict) -> bytes:
+    buf = io.BytesIO()
+    c = canvas.Canvas(buf, pagesize=(page_w, page_h))
+
     # cover_rects 표시(빨간 테두리)
     c.setStrokeColorRGB(1, 0, 0)
     c.setLineWidth(1)
@@ -231,6 +254,7 @@ def make_guide_overlay_pdf(overlay_path: str, page_w: float, page_h: float, cfg:
         c.drawString(x, y + h + 2, k)
 
     c.save()
+    return buf.getvalue()
 
 # =========================
 # 1행 처리(템플릿+오버레이 merge)
@@ -244,7 +268,7 @@ def render_row(row: dict, create_guide: bool = False):
         raise KeyError(f"COORDS에 없는 brand: {brand} (허용: {list(COORDS.keys())})")
 
     template_pdf = find_template_pdf(brand, box_type, box_group)
-    reader = PdfReader(template_pdf)
+    reader = PdfReader(io.BytesIO(_load_template_bytes(template_pdf)))
     base_page = reader.pages[0]
 
     page_w = float(base_page.mediabox.width)
@@ -254,10 +278,13 @@ def render_row(row: dict, create_guide: bool = False):
 
     # 가이드 PDF 생성 모드
     if create_guide:
-        overlay_path = os.path.join(GUIDE_DIR, f"__guide_overlay_{brand}_{norm(box_type)}_{norm(box_group)}.pdf")
-        make_guide_overlay_pdf(overlay_path, page_w, page_h, cfg)
+        # 격자는 페이지 크기별 캐시 병합, 템플릿별 표시만 새로 그린다
+        grid_reader = PdfReader(io.BytesIO(_guide_grid_bytes(round(page_w, 1), round(page_h, 1))))
+        base_page.merge_page(grid_reader.pages[0])
 
-        overlay_reader = PdfReader(overlay_path)
+        overlay_bytes = make_guide_overlay_pdf(page_w, page_h, cfg)
+
+        overlay_reader = PdfReader(io.BytesIO(overlay_bytes))
         base_page.merge_page(overlay_reader.pages[0])
 
         out_guide = os.path.join(GUIDE_DIR, f"GUIDE_{brand}_{box_type}_{box_group}.pdf")
@@ -266,19 +293,13 @@ def render_row(row: dict, create_guide: bool = False):
         with open(out_guide, "wb") as f:
             w.write(f)
 
-        try:
-            os.remove(overlay_path)
-        except:
-            pass
-
         return out_guide
 
     # 실제 출력 모드
     sku = str(row["item_code"])
-    overlay_path = os.path.join(OUT_DIR, f"__overlay_{sku}.pdf")
-    make_overlay_pdf(overlay_path, page_w, page_h, cfg, row)
+    overlay_bytes = make_overlay_pdf(page_w, page_h, cfg, row)
 
-    overlay_reader = PdfReader(overlay_path)
+    overlay_reader = PdfReader(io.BytesIO(overlay_bytes))
     base_page.merge_page(overlay_reader.pages[0])
 
     out_path = os.path.join(OUT_DIR, f"{brand}_{box_type}_{box_group}_{sku}.pdf")
@@ -287,11 +308,6 @@ def render_row(row: dict, create_guide: bool = False):
     with open(out_path, "wb") as f:
         w.write(f)
 
-    try:
-        os.remove(overlay_path)
-    except:
-        pass
-
     return out_path
 
 def main():
@@ -302,7 +318,11 @@ def main():
 
     register_fonts()
 
-    df = pd.read_excel(XLSX_PATH)
+    # calamine(Rust) 엔진이 있으면 단일 패스 파서로 읽기 (openpyxl 대비 수 배 빠름)
+    try:
+        df = pd.read_excel(XLSX_PATH, engine="calamine")
+    except (ImportError, ValueError):
+        df = pd.read_excel(XLSX_PATH)
 
     required = ["brand","box_type","box_group","item_code","product_name_ko","product_name_en","origin_country"]
     missing = [c for c in required if c not in df.columns]